@@ -27,14 +27,15 @@ script_version = "20-217a"
 # ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
 # WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
+# Only modules needed at startup, on hot paths or at the prompt are imported
+# here. Other modules used by a single function (datetime, re, subprocess, ...)
+# are imported inside that function on first use, which keeps startup fast.
 from collections import abc
-from datetime import datetime
 from decimal import Decimal
 from fractions import Fraction
-from random import randint
+import functools
 import math
-import string
-import re
+import operator
 
 #################
 ### Constants ###
@@ -94,53 +95,58 @@ def asinhd(x): return deg(asinh(x))
 def acoshd(x): return deg(acosh(x))
 def atanhd(x): return deg(atanh(x))
 
-# Convert base unit to SI prefix
+# Convert base unit to SI prefix. The prefix factors below are literal powers of
+# ten, which the compiler folds into constants, so each conversion is a single
+# multiplication rather than a call to exp10().
 def exp10(x, y): return x * 10**y
-def to_yotta(x): return exp10(x, -24)
-def to_zetta(x): return exp10(x, -21)
-def to_exa(x): return exp10(x, -18)
-def to_peta(x): return exp10(x, -15)
-def to_tera(x): return exp10(x, -12)
-def to_giga(x): return exp10(x, -9)
-def to_mega(x): return exp10(x, -6)
-def to_kilo(x): return exp10(x, -3)
-def to_centi(x): return exp10(x, 2)
-def to_milli(x): return exp10(x, 3)
-def to_micro(x): return exp10(x, 6)
-def to_nano(x): return exp10(x, 9)
-def to_angstrom(x): return exp10(x, 10)
-def to_pico(x): return exp10(x, 12)
-def to_femto(x): return exp10(x, 15)
-def to_atto(x): return exp10(x, 18)
-def to_zepto(x): return exp10(x, 21)
-def to_yocto(x): return exp10(x, 24)
+def to_yotta(x): return x * 10**-24
+def to_zetta(x): return x * 10**-21
+def to_exa(x): return x * 10**-18
+def to_peta(x): return x * 10**-15
+def to_tera(x): return x * 10**-12
+def to_giga(x): return x * 10**-9
+def to_mega(x): return x * 10**-6
+def to_kilo(x): return x * 10**-3
+def to_centi(x): return x * 10**2
+def to_milli(x): return x * 10**3
+def to_micro(x): return x * 10**6
+def to_nano(x): return x * 10**9
+def to_angstrom(x): return x * 10**10
+def to_pico(x): return x * 10**12
+def to_femto(x): return x * 10**15
+def to_atto(x): return x * 10**18
+def to_zepto(x): return x * 10**21
+def to_yocto(x): return x * 10**24
 
 # Convert SI prefix to base unit
-def from_yotta(x): return exp10(x, 24)
-def from_zetta(x): return exp10(x, 21)
-def from_exa(x): return exp10(x, 18)
-def from_peta(x): return exp10(x, 15)
-def from_tera(x): return exp10(x, 12)
-def from_giga(x): return exp10(x, 9)
-def from_mega(x): return exp10(x, 6)
-def from_kilo(x): return exp10(x, 3)
-def from_centi(x): return exp10(x, -2)
-def from_milli(x): return exp10(x, -3)
-def from_micro(x): return exp10(x, -6)
-def from_nano(x): return exp10(x, -9)
-def from_angstrom(x): return exp10(x, -10)
-def from_pico(x): return exp10(x, -12)
-def from_femto(x): return exp10(x, -15)
-def from_atto(x): return exp10(x, -18)
-def from_zepto(x): return exp10(x, -21)
-def from_yocto(x): return exp10(x, -24)
+def from_yotta(x): return x * 10**24
+def from_zetta(x): return x * 10**21
+def from_exa(x): return x * 10**18
+def from_peta(x): return x * 10**15
+def from_tera(x): return x * 10**12
+def from_giga(x): return x * 10**9
+def from_mega(x): return x * 10**6
+def from_kilo(x): return x * 10**3
+def from_centi(x): return x * 10**-2
+def from_milli(x): return x * 10**-3
+def from_micro(x): return x * 10**-6
+def from_nano(x): return x * 10**-9
+def from_angstrom(x): return x * 10**-10
+def from_pico(x): return x * 10**-12
+def from_femto(x): return x * 10**-15
+def from_atto(x): return x * 10**-18
+def from_zepto(x): return x * 10**-21
+def from_yocto(x): return x * 10**-24
 
 ########################
 ### Unit Conversions ###
 ########################
 
-import subprocess # Used for calling out to GNU units
-gnu_units_output = re.compile(
+# The GNU Units pattern and the subprocess module are only needed once a
+# conversion is actually requested, so both are loaded on first use by
+# `_units_output()` and `_units_interactive()` rather than at startup.
+gnu_units_output = None
+gnu_units_pattern = (
     r'(?:\t?(?P<reci_note>reciprocal conversion)?\n?'
     '\t\* (?P<normal>[\d\.\-\+e]+)\n'
     '\t/ (?P<reciprocal>[\d\.\-\+e]+))|'
@@ -149,6 +155,90 @@ gnu_units_output = re.compile(
     '\t[\d\.\-\+e]+ (?P<out_unit>[^\n]+))')
 gnu_units_executable = 'gunits'
 
+# Compile the GNU Units output pattern on first use and cache it. GNU Units
+# output is plain ASCII, so ASCII matching is used for the character classes.
+def _units_output():
+    global gnu_units_output
+    if gnu_units_output is None:
+        import re
+        gnu_units_output = re.compile(gnu_units_pattern, re.ASCII)
+    return gnu_units_output
+
+# A single interactive GNU Units process is kept running and fed one query at a
+# time, so that each conversion does not pay for starting GNU Units and loading
+# its unit definitions. Where `stdbuf` is available, the process is asked to
+# flush its output after every line, since GNU Units may otherwise hold its
+# answers in a pipe buffer. `gnu_units_process` is None until the first query,
+# and False once the interactive process has been given up on, which happens
+# after `gnu_units_max_failures` queries in a row got no recognisable answer
+# within `gnu_units_timeout` seconds; queries then fall back to running GNU
+# Units once per conversion.
+gnu_units_process = None
+gnu_units_timeout = 0.25
+gnu_units_failures = 0
+gnu_units_max_failures = 2
+
+# Discard the interactive GNU Units process after a failed query, and stop
+# starting new ones once too many queries in a row have failed.
+def _units_failed(proc):
+    global gnu_units_process, gnu_units_failures
+    proc.kill()
+    gnu_units_failures += 1
+    if gnu_units_failures >= gnu_units_max_failures:
+        gnu_units_process = False
+    else:
+        gnu_units_process = None
+
+# Send one conversion to the interactive GNU Units process and return its
+# output, or None if the process could not give a recognisable answer. Error
+# messages and warnings are read from the same pipe as answers; after any
+# unrecognised reply (such as an unknown unit error), GNU Units may be waiting
+# for the unit again, so the process is discarded and the failure counted.
+def _units_interactive(have, want):
+    global gnu_units_process, gnu_units_failures
+    import os, select, shutil, subprocess
+    try:
+        if gnu_units_process is None or gnu_units_process.poll() is not None:
+            if not shutil.which(gnu_units_executable):
+                return None
+            command = [gnu_units_executable, '--quiet']
+            if shutil.which('stdbuf'):
+                command = ['stdbuf', '-oL'] + command
+            gnu_units_process = subprocess.Popen(command,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT, bufsize=0)
+        proc = gnu_units_process
+        proc.stdin.write(f'{have}\n{want}\n'.encode('utf-8'))
+        out = b''
+        while True:
+            lines = out.split(b'\n')[:-1]
+            if lines:
+                first = lines[0].strip()
+                if first.startswith(b'* '):
+                    needed = 2
+                elif first in (b'reciprocal conversion',
+                        b'conformability error'):
+                    needed = 3
+                else:
+                    _units_failed(proc)
+                    return None
+                if len(lines) >= needed:
+                    gnu_units_failures = 0
+                    return out.decode('utf-8')
+            if not select.select([proc.stdout], [], [], gnu_units_timeout)[0]:
+                _units_failed(proc)
+                return None
+            chunk = os.read(proc.stdout.fileno(), 4096)
+            if not chunk:
+                _units_failed(proc)
+                return None
+            out += chunk
+    except (OSError, ValueError):
+        if gnu_units_process:
+            gnu_units_process.kill()
+        gnu_units_process = False
+        return None
+
 # Evaluate a query using [GNU Units](en.wikipedia.org/wiki/GNU_Units),
 # returning a tuple containing the direct conversion, and the reciprocal
 # conversion, respectively.
@@ -158,17 +248,22 @@ gnu_units_executable = 'gunits'
 # If any errors occur, or if the output does not match the expected format, the
 # output of GNU Units will be returned directly as a string.
 def units(v, a, b):
-    result = subprocess.run([gnu_units_executable, f'{v}{a}', b],
-        stdout=subprocess.PIPE).stdout.decode('utf-8')
-    m = gnu_units_output.match(result)
+    result = None
+    if gnu_units_process is not False and b and '\n' not in f'{a}{b}':
+        result = _units_interactive(f'{v}{a}', b)
+    if result is None:
+        import subprocess # Used for calling out to GNU units
+        result = subprocess.run([gnu_units_executable, f'{v}{a}', b],
+            stdout=subprocess.PIPE).stdout.decode('utf-8')
+    m = _units_output().match(result)
     if m:
-        if m.group('conform_note'):
-            return (m.group('conform_note'), m.group('in_unit'),
-                m.group('out_unit'))
-        if m.group('reci_note'):
-            return (float(m.group('normal')), float(m.group('reciprocal')),
-                m.group('reci_note'))
-        return (float(m.group('normal')), float(m.group('reciprocal')))
+        normal, reciprocal, reci_note = m.group(
+            'normal', 'reciprocal', 'reci_note')
+        if normal is None:
+            return m.group('conform_note', 'in_unit', 'out_unit')
+        if reci_note is None:
+            return (float(normal), float(reciprocal))
+        return (float(normal), float(reciprocal), reci_note)
     return result
 
 # This is a shortcut for the `units()` function. It is defined separately in
@@ -195,10 +290,23 @@ def uu(v, a, b, silent=False):
 
 # Evaluate the quadratic formula for ax^2+bx+c=0
 def quad_det(a, b, c):
-    return b**2-4*a*c
+    return b*b - 4*a*c
+# The roots are found with the numerically stable form of the formula, which
+# avoids cancellation between -b and the square root of the discriminant. The
+# root with the larger magnitude is q/a and the other is c/q; they are returned
+# in the same order as (-b+sqrt(d))/(2a), (-b-sqrt(d))/(2a).
 def quad(a, b, c):
-    return ((-b+sqrt(quad_det(a, b, c)))/(2*a),
-            (-b-sqrt(quad_det(a, b, c)))/(2*a))
+    s = sqrt(quad_det(a, b, c))
+    if b >= 0:
+        q = -(b + s) / 2
+        if q != 0:
+            return (c / q, q / a)
+        # q == 0 only if b == 0 and a*c == 0; the double root is -b/(2a), and
+        # a == 0 still raises ZeroDivisionError as it has no roots to return
+        r = -b / (2*a)
+        return (r, r)
+    q = (s - b) / 2
+    return (q / a, c / q)
 
 # Get the midpoint
 def mid(a, b):
@@ -209,52 +317,63 @@ def mid2(x1, y1, x2, y2):
 def dist(a, b):
     return b-a
 def dist2(x1, y1, x2, y2):
-    return (dist(x1, x2)**2 + dist(y1, y2)**2)**0.5
+    return hypot(dist(x1, x2), dist(y1, y2))
 
 # Linear interpolation
 def lint(x1, xn, x2, y1, y2):
     return (y2 - y1) / (x2 - x1) * (xn - x1) + y1
 
+# Build a function that evaluates the polynomial c0 + c1*x + c2*x^2 + ... for a
+# fixed list of coefficients. The coefficients are written into the generated
+# source as constants in Horner form, so repeated evaluations, such as
+# `cp = make_poly(C1, C2, C3); cp(300); cp(400)`, do no list handling at all.
+def make_poly(*coeff):
+    coeff = [int(c) if isinstance(c, int) else float(c)
+            for c in flatten_list(coeff)]
+    src = repr(coeff[-1]) if coeff else '0'
+    for c in reversed(coeff[:-1]):
+        src = f'{c!r} + x * ({src})'
+    return eval('lambda x: ' + src, {'inf': math.inf, 'nan': math.nan})
+
 # Pythagorean theorem
 def pythleg(c, a):
-    return sqrt(c**2 - a**2)
+    return sqrt(c*c - a*a)
 
-# Generate diceware values
+# Generate diceware values. Each line is one uniform draw from the 6^5 possible
+# rolls of five dice, taken from the operating system's cryptographic random
+# source, and printed with a single call.
 def diceware(n = 5):
+    import secrets
     for i in range(0, n):
-        print(str(i + 1) + ": ", end="")
-        for i in range(0, 5):
-            print(randint(1, 6), end="")
-        print()
+        roll = secrets.randbelow(6**5)
+        digits = []
+        for _ in range(0, 5):
+            roll, d = divmod(roll, 6)
+            digits.append(str(d + 1))
+        print(str(i + 1) + ": " + ''.join(digits))
 
 ######################
 ### Thermodynamics ###
 ######################
 
-# Calculate enthalpy specific heat on a mole basis
+# Calculate enthalpy specific heat on a mole basis. The polynomial is evaluated
+# with Horner's method, which also works element-wise if T is an array.
 def heat_cp_mol(T, *coeff):
     coeff = flatten_list(coeff)
-    c_p = 0;
-    for i in range(0, 3):
-        c_p += coeff[i] * T**i
-    return c_p
+    return (coeff[2] * T + coeff[1]) * T + coeff[0]
 
 # Calculate internal energy specific heat on a mole basis
 def heat_cv_mol(R, T, *coeff):
-    return heat_cp_mol(T, coeff) - R
+    return heat_cp_mol(T, *coeff) - R
 
 # Calculate enthalpy on a mole basis
 def heat_h_mol(T, *coeff):
     coeff = flatten_list(coeff)
-    h = 0
-    for i in range(0, 3):
-        h += coeff[i] * T**(i + 1) / (i + 1)
-    return h
+    return T * (coeff[0] + T * (coeff[1] / 2 + T * coeff[2] / 3))
 
 # Calculate internal energy on a mole basis
 def heat_u_mol(R, T, *coeff):
-    coeff = flatten_list(coeff)
-    h =  heat_h_mol(T, coeff)
+    h = heat_h_mol(T, *coeff)
     return h - R * T
 
 #########################
@@ -269,39 +388,52 @@ def sci(x, sigfig = 6):
     string = "{:." + str(sigfig - 1) + "e}"
     return string.format(x)
 
-# Convert x to engineering notation
+# Convert x to engineering notation. The decimal exponent is found with log10,
+# bumped if rounding x to sigfig digits carries into the next power of ten, and
+# then lowered to a multiple of three.
 def eng(x, sigfig = 6):
-    sci_string = sci(x)
-    components = sci_string.split('e')
-    exponent = int(components[1])
+    if sigfig < 1:
+        sigfig = 1
+    if x == 0 or not math.isfinite(x):
+        return sci(x, sigfig)
+    exponent = floor(log10(abs(x)))
+    try:
+        x = round(x, sigfig - 1 - exponent) # Rounded exactly, as in sci()
+        rounded = True
+    except OverflowError: # x rounds up past the largest float
+        rounded = False
+    if exponent > -300:
+        mantissa = x / 10.0 ** exponent
+    else: # 10.0 ** exponent would underflow for subnormal x
+        mantissa = x * 1e300 / 10.0 ** (exponent + 300)
+    if not rounded:
+        mantissa = round(mantissa, sigfig - 1)
+    if round(abs(mantissa), sigfig - 1) >= 10:
+        exponent += 1
+        mantissa /= 10
     offset = exponent % 3
-    head = components[0].replace('.', '')
-    is_negative = False
-    if head[0] == '-':
-        is_negative = True
-        head = head[1:]
-    head = head[:(offset + 1)] + ('.' if sigfig > 1 else '') + \
-            head[(offset + 1):]
-    new_exponent = exponent - offset
-    out = ('-' if is_negative else '') + head + 'e' + \
-            ('+' if new_exponent >= 0 else '-') + \
-            ('0' if abs(new_exponent) < 10 else '') + str(abs(new_exponent))
-    return out
-
-# Convert an int n to an arbitrary base b (as string)
+    return '{:.{}f}e{:+03d}'.format(mantissa * 10 ** offset,
+            max(sigfig - 1 - offset, 0), exponent - offset)
+
+# Convert an int n to an arbitrary base b (as string). Bases with a built-in
+# format code are converted by format() in C; other bases fall back to repeated
+# division, peeling off one digit per step.
+base_digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+base_formats = {2: 'b', 8: 'o', 10: 'd', 16: 'x'}
 def to_base(n, b):
-    num_dict = string.digits + string.ascii_lowercase
+    if b in base_formats:
+        return format(n, base_formats[b])
     if n < 0:
         sign = -1
     elif n == 0:
-        return num_dict[0]
+        return base_digits[0]
     else:
         sign = 1
     n *= sign
     digits = []
     while n:
-        digits.append(num_dict[n % b])
-        n //= b # Double-slash forces integer division
+        n, d = divmod(n, b)
+        digits.append(base_digits[d])
     if sign < 0:
         digits.append('-')
     digits.reverse()
@@ -311,15 +443,32 @@ def to_base(n, b):
 ### Temperature Conversions ###
 ###############################
 
-# Absolute zero checks
+# Absolute zero checks. The conversions below are plain arithmetic, so they
+# also accept NumPy arrays and convert every element in one broadcast
+# operation; in that case, any element below absolute zero becomes NaN.
 abs_zero_f = -459.67
 abs_zero_c = -273.15
 abs_zero_k = 0
+
+# Called whenever a conversion result is below absolute zero. Set
+# `temp_zero_hook = None` to skip the message, e.g. when bulk-converting arrays
+# where NaN elements are expected.
+def temp_zero_warning():
+    print("Invalid. Result is below absolute zero.")
+temp_zero_hook = temp_zero_warning
+
 def temp_check_zero(temp, zero):
-    if temp < zero:
-        print("Invalid. Result is below absolute zero.")
-        return float('NaN')
-    return round(temp, 8)
+    if getattr(temp, 'ndim', 0): # NumPy array (already imported by the caller)
+        import numpy as np
+        below = temp < zero
+        if temp_zero_hook is not None and below.any():
+            temp_zero_hook()
+        return np.where(below, np.nan, np.round(temp, 8))
+    if not temp < zero:
+        return round(temp, 8)
+    if temp_zero_hook is not None:
+        temp_zero_hook()
+    return float('NaN')
 
 # Conversions
 def temp_fc(f):
@@ -345,8 +494,15 @@ def temp_kf(k):
 ### Fractions ###
 #################
 
-# Creates a Fraction object
+# Creates a Fraction object. Approximations of floats are cached, keyed on the
+# exact hexadecimal form of the float, so repeated queries on the same value
+# skip the continued fraction search.
+@functools.lru_cache(maxsize=1024)
+def _getfrac_cached(x_bits):
+    return Fraction(float.fromhex(x_bits)).limit_denominator()
 def getfrac(x):
+    if isinstance(x, float):
+        return _getfrac_cached(x.hex())
     return Fraction(x).limit_denominator()
 
 # Prints a string representation of x as a fraction
@@ -369,8 +525,12 @@ def mix(x):
 ### Vectors ###
 ###############
 
-# Convert an n-dimensional vector to a 3-dimensional one
+# Convert an n-dimensional vector to a 3-dimensional one. Every vector function
+# returns a 3-tuple, so those are passed through as-is; chained operations such
+# as `vunit(vsub(vcross(a, b), c))` then never rebuild their intermediates.
 def vector_to_3d(a):
+    if type(a) is tuple and len(a) == 3:
+        return a
     n = len(a)
     if n == 1:
         return (a[0], 0, 0)
@@ -380,6 +540,8 @@ def vector_to_3d(a):
         return (a[0], a[1], a[2])
     return (0, 0, 0) # This should only happen if n == 0
 
+def vec(*x): # build a 3-dimensional vector from up to three components
+    return vector_to_3d(x)
 def vcross(a, b): # cross (vector) product of vector a and vector b
     a_ = vector_to_3d(a)
     b_ = vector_to_3d(b)
@@ -394,7 +556,9 @@ def vneg(a): # negate vector a
     a_ = vector_to_3d(a)
     return (-a_[0], -a_[1], -a_[2])
 def vsub(a, b): # subtract vector b from vector a
-    return vadd(a, vneg(b))
+    a_ = vector_to_3d(a)
+    b_ = vector_to_3d(b)
+    return (a_[0] - b_[0], a_[1] - b_[1], a_[2] - b_[2])
 def vdot(a, b): # dot (scalar) product of vector a and vector b
     a_ = vector_to_3d(a)
     b_ = vector_to_3d(b)
@@ -404,13 +568,23 @@ def vscale(a, alpha): # scale vector a by scalar alpha
     return (a_[0] * alpha, a_[1] * alpha, a_[2] * alpha)
 def vlen(a): # get absolute value
     a_ = vector_to_3d(a)
-    return sqrt(a_[0]**2 + a_[1]**2 + a_[2]**2)
+    return sqrt(a_[0] * a_[0] + a_[1] * a_[1] + a_[2] * a_[2])
 def vproj(a, b): # projection of a onto b
-    return vscale(b, vdot(a, b) / vdot(b, b))
+    a_ = vector_to_3d(a)
+    b_ = vector_to_3d(b)
+    k = (a_[0] * b_[0] + a_[1] * b_[1] + a_[2] * b_[2]) / \
+            (b_[0] * b_[0] + b_[1] * b_[1] + b_[2] * b_[2])
+    return (b_[0] * k, b_[1] * k, b_[2] * k)
 def vunit(a): # makes a unit vector
-    return vscale(a, 1 / vlen(a))
+    a_ = vector_to_3d(a)
+    k = 1 / sqrt(a_[0] * a_[0] + a_[1] * a_[1] + a_[2] * a_[2])
+    return (a_[0] * k, a_[1] * k, a_[2] * k)
 def vtheta(a, b): # find the angle between two vectors in radians
-    return acos(vdot(a, b) / (vlen(a) * vlen(b)))
+    a_ = vector_to_3d(a)
+    b_ = vector_to_3d(b)
+    return acos((a_[0] * b_[0] + a_[1] * b_[1] + a_[2] * b_[2]) /
+            (sqrt(a_[0] * a_[0] + a_[1] * a_[1] + a_[2] * a_[2]) *
+             sqrt(b_[0] * b_[0] + b_[1] * b_[1] + b_[2] * b_[2])))
 def dvtheta(a, b): # find the angle between two vectors in degrees
     return deg(vtheta(a, b))
 
@@ -419,43 +593,35 @@ def dvtheta(a, b): # find the angle between two vectors in degrees
 #############
 
 # Given a list containing some combination of (possibly deeply nested) Iterables
-# and non-iterables, produce a single list of non-iterables. No guarentees are
-# made regarding the order of the output values with respect to the input
-# structure.
+# and non-iterables, produce a single list of non-iterables. The input is walked
+# once, depth-first, so the output values appear in the same order as they do in
+# the input structure. Strings and bytes are treated as single values.
 def flatten_list(*x):
-    n = x
     m = []
-    is_flat = False
-    while not is_flat:
-        is_flat = True
-        for i in n:
-            if isinstance(i, abc.Iterable):
-                is_flat = False
-                for j in i:
-                    m.append(j)
-            else:
-                m.append(i)
-        n = m
-        m = []
-    return n
+    stack = [iter(x)]
+    # Bound locally, as these are looked up once per value in the loop below
+    append, push, pop = m.append, stack.append, stack.pop
+    iterable = abc.Iterable
+    while stack:
+        try:
+            i = next(stack[-1])
+        except StopIteration:
+            pop()
+            continue
+        if isinstance(i, (str, bytes)) or not isinstance(i, iterable):
+            append(i)
+        else:
+            push(iter(i))
+    return m
 
 # Given a (possibly deeply nested) list of numbers, produce a flattened list of
-# floating-point numbers. No guarentees are made regarding the order of the
-# output values with respect to the input structure.
+# floating-point numbers, in the same order as they appear in the input.
 def to_float_list(*x):
-    n = flatten_list(x)
-    m = []
-    for i in n:
-        m.append(float(i))
-    return m
+    return list(map(float, flatten_list(x)))
 
 # Similar to to_float_list(), but casts all numbers to int().
 def to_int_list(*x):
-    n = flatten_list(x)
-    m = []
-    for i in n:
-        m.append(int(i))
-    return m
+    return list(map(int, flatten_list(x)))
 
 # Floating-point sum of a list
 def fsum(*x):
@@ -463,30 +629,31 @@ def fsum(*x):
 
 # Integer sum of a list
 def isum(*x):
-    n = to_int_list(x)
-    sum = 0
-    for i in n:
-        sum += i
-    return int(sum)
+    return sum(to_int_list(x))
+
+# Arithmetic mean and population standard deviation of an already flattened
+# list of floats, computed together so that callers needing both only walk the
+# input once.
+def _mean_stddev(n):
+    avg = math.fsum(n) / len(n)
+    deviation = [i - avg for i in n]
+    variance = math.fsum(map(operator.mul, deviation, deviation)) / len(n)
+    return avg, sqrt(variance)
 
 # Arithmetic mean of a list
 def mean(*x):
-    n = flatten_list(x)
-    return fsum(n) / len(n)
+    n = to_float_list(x)
+    return math.fsum(n) / len(n)
 
 # Population Standard Deviation of a list
 def stdDev(*x):
-    n = to_float_list(x)
-    avg = mean(n)
-    total_deviation = 0
-    for i in n:
-        total_deviation += (i - avg) ** 2
-    return sqrt(1 / len(n) * total_deviation)
+    return _mean_stddev(to_float_list(x))[1]
 
 # %RSD of a list
 def pctRSD(*x):
     try:
-        return stdDev(x) / mean(x) * 100
+        avg, std = _mean_stddev(to_float_list(x))
+        return std / avg * 100
     except ZeroDivisionError:
         return float('NaN')
 
@@ -494,27 +661,23 @@ def pctRSD(*x):
 ### Cellular Data Statistics ###
 ################################
 
+# Days in each month (ignoring leap years) and month name lookups
+month_days = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+month_numbers = { 'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+        'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12}
+
 # Given an integer from 1 to 12 (inclusive) representing a month, or the name
 # of a month return the number of days in that month, ignoring leap years. If
 # an invalid input is received, the function will not throw an exception, but
 # will silently return 31.
 def days_in_month(month):
-    month_names = { 'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
-            'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12}
-    shortmonths = [4, 6, 9, 11]
     try:
         month_number = int(month)
-    except ValueError:
-        try:
-            month_number = month_names[str(month).lower()[:3]]
-        except KeyError: # Will default to 31 days
-            month_number = 0
-    if month_number in shortmonths:
-        return 30
-    elif month_number == 2: # Februrary
-        return 28
-    else: # For simplicity, assume 31 days if input is invalid.
-        return 31
+    except (TypeError, ValueError):
+        month_number = month_numbers.get(str(month).lower()[:3], 0)
+    if 1 <= month_number <= 12:
+        return month_days[month_number - 1]
+    return 31 # For simplicity, assume 31 days if input is invalid.
 
 
 # Given the current amount of data used (in Gigabytes), and the total data
@@ -522,6 +685,7 @@ def days_in_month(month):
 # much data should be used to yield a uniform usage pattern throughout the
 # month.
 def data(gb, total, reset_day = 11):
+    from datetime import datetime
     now = datetime.now()
     if now.day >= reset_day:
         totalDays = days_in_month(now.month)